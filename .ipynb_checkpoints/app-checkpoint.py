@@ -13,9 +13,6 @@ from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
 from googleapiclient.discovery import build
 
-nltk.download('punkt')
-nltk.download('stopwords')
-
 st.set_page_config(
     page_title="Spam Email Classifier",
     page_icon="📧",
@@ -30,6 +27,7 @@ EMAILS_PER_PAGE = 10
 @st.cache_resource
 def init_nltk():
     """Initialize NLTK components with caching"""
+    nltk.data.path.insert(0, os.environ.get("NLTK_DATA", os.path.join(os.getcwd(), "nltk_data")))
     try:
         nltk.data.find('tokenizers/punkt')
         nltk.data.find('corpora/stopwords')
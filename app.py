@@ -3,13 +3,14 @@ Spam Email Detector - Main Application
 Streamlit-based web application for detecting spam emails
 """
 
+import threading
 import streamlit as st
-from typing import Optional
+from typing import Optional, List, Tuple
 from config import UI_CONFIG, EMAILS_PER_PAGE
 from logger import log_info, log_warning
-from core.model_utils import load_models, predict_spam
-from core.gmail_utils import fetch_emails
-from core.text_utils import clean_text_for_model, extract_links
+from core.model_utils import load_models, predict_spam, predict_spam_batch
+from core.gmail_utils import fetch_emails, prefetch_emails
+from core.text_utils import clean_and_extract, escape_markdown
 
 st.set_page_config(
     page_title=UI_CONFIG["page_title"],
@@ -20,12 +21,37 @@ st.set_page_config(
 tfidf, model = load_models()
 
 
+@st.cache_data(max_entries=1024, show_spinner=False)
+def classify_emails(contents: Tuple[str, ...]) -> List[Tuple[Optional[int], float]]:
+    """Classify cleaned email contents, cached so reruns skip the model"""
+    return predict_spam_batch(list(contents), tfidf, model)
+
+
 def initialize_session_state() -> None:
     """Initialize session state variables"""
     if "page_token_stack" not in st.session_state:
         st.session_state.page_token_stack = [None]
     if "current_page_index" not in st.session_state:
         st.session_state.current_page_index = 0
+    if "prefetch_thread" not in st.session_state:
+        st.session_state.prefetch_thread = None
+    if "prefetched_token" not in st.session_state:
+        st.session_state.prefetched_token = None
+
+
+def prefetch_page(page_token: str) -> None:
+    """Warm the email page cache for the given page in a background thread"""
+    thread = st.session_state.prefetch_thread
+    if thread is not None and thread.is_alive():
+        return
+    if st.session_state.prefetched_token == page_token:
+        return
+    
+    log_info("Prefetching next page of emails in background")
+    thread = threading.Thread(target=prefetch_emails, args=(page_token,), daemon=True)
+    thread.start()
+    st.session_state.prefetch_thread = thread
+    st.session_state.prefetched_token = page_token
 
 
 def main() -> None:
@@ -67,10 +93,10 @@ def gmail_analysis_page() -> None:
     
     st.info(f"Analyzing {len(emails)} emails (Page {st.session_state.current_page_index + 1})")
     
+    predictions = classify_emails(tuple(email["cleaned_content"] for email in emails))
+    
     spam_count = 0
-    for idx, email in enumerate(emails):
-        prediction, confidence = predict_spam(email["cleaned_content"], tfidf, model)
-        
+    for idx, (email, (prediction, confidence)) in enumerate(zip(emails, predictions)):
         if prediction == 1:
             spam_count += 1
             status = "🚨 **SPAM**"
@@ -106,7 +132,7 @@ def gmail_analysis_page() -> None:
             content_preview = email["raw_content"][:UI_CONFIG["preview_length"]]
             if len(email["raw_content"]) > UI_CONFIG["preview_length"]:
                 content_preview += "..."
-            st.text_area("", content_preview, height=100, key=f"email_{idx}")
+            st.caption(escape_markdown(content_preview))
     
     st.markdown("---")
     col1, col2, col3 = st.columns(3)
@@ -134,6 +160,9 @@ def gmail_analysis_page() -> None:
                 st.session_state.page_token_stack.append(next_token)
             st.session_state.current_page_index += 1
             st.rerun()
+    
+    if next_token:
+        prefetch_page(next_token)
 
 
 def manual_text_page() -> None:
@@ -153,7 +182,7 @@ def manual_text_page() -> None:
             return
         
         with st.spinner("Analyzing text..."):
-            cleaned_text = clean_text_for_model(input_text)
+            cleaned_text, links = clean_and_extract(input_text)
             prediction, confidence = predict_spam(cleaned_text, tfidf, model)
         
         if prediction is None:
@@ -170,7 +199,6 @@ def manual_text_page() -> None:
             st.success("✅ **TEXT APPEARS SAFE**")
             st.markdown(f"**Confidence:** {confidence:.2%}")
         
-        links = extract_links(input_text)
         if links:
             st.subheader("🔗 Links Found:")
             for link in links:
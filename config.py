@@ -11,6 +11,14 @@ SCOPES = ["https://www.googleapis.com/auth/gmail.readonly"]
 
 EMAILS_PER_PAGE = 10
 
+GMAIL_BATCH_SIZE = 100
+
+GMAIL_NUM_RETRIES = 3
+
+GMAIL_MESSAGE_FIELDS = "payload(mimeType,headers(name,value),body/data,parts)"
+
+GMAIL_CACHE_TTL = 300
+
 TEXT_VALIDATION = {
     "min_length": 1,
     "max_length": 100000,
@@ -34,6 +42,7 @@ PATHS = {
     "vectorizer_file": os.path.join(BASE_DIR, "models", "vectorizer.pkl"),
     "model_file": os.path.join(BASE_DIR, "models", "model.pkl"),
     "dataset_file": os.path.join(BASE_DIR, "dataset", "spam.csv"),
+    "nltk_data_dir": os.environ.get("NLTK_DATA", os.path.join(BASE_DIR, "nltk_data")),
 }
 
 LOGGING_CONFIG = {
@@ -12,8 +12,10 @@ from .text_utils import (
     transform_text,
     clean_html,
     clean_text_for_display,
+    escape_markdown,
     clean_text_for_model,
     extract_links,
+    clean_and_extract,
 )
 
 from .validation_utils import (
@@ -25,11 +27,14 @@ from .validation_utils import (
 from .model_utils import (
     load_models,
     predict_spam,
+    predict_spam_batch,
 )
 
 from .gmail_utils import (
     gmail_authenticate,
+    get_gmail_service,
     fetch_emails,
+    prefetch_emails,
     extract_email_content,
 )
 
@@ -38,8 +43,10 @@ __all__ = [
     "transform_text",
     "clean_html",
     "clean_text_for_display",
+    "escape_markdown",
     "clean_text_for_model",
     "extract_links",
+    "clean_and_extract",
     # Validation utilities
     "validate_text_input",
     "validate_email_data",
@@ -47,8 +54,11 @@ __all__ = [
     # Model utilities
     "load_models",
     "predict_spam",
+    "predict_spam_batch",
     # Gmail utilities
     "gmail_authenticate",
+    "get_gmail_service",
     "fetch_emails",
+    "prefetch_emails",
     "extract_email_content",
 ]
@@ -4,27 +4,57 @@ Gmail API utilities for Spam Email Detector
 
 import os
 import base64
+import threading
 import streamlit as st
-from typing import Tuple, Dict, List, Optional
+from collections import deque
+from typing import Tuple, Dict, List, Optional, Callable, Union
+from google.auth.exceptions import RefreshError
 from google.auth.transport.requests import Request
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
 from googleapiclient.discovery import build
+from googleapiclient.errors import HttpError
+from googleapiclient.http import _should_retry_response
+from googleapiclient.model import JsonModel
 
 try:
-    from ..config import SCOPES, PATHS, ERROR_MESSAGES, EMAILS_PER_PAGE
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    from ..config import SCOPES, PATHS, ERROR_MESSAGES, EMAILS_PER_PAGE, GMAIL_BATCH_SIZE, GMAIL_MESSAGE_FIELDS, GMAIL_CACHE_TTL, GMAIL_NUM_RETRIES
     from ..logger import log_info, log_warning, log_error, log_debug
-    from .text_utils import clean_text_for_display, clean_text_for_model, extract_links
-    from .validation_utils import validate_email_data
 except ImportError:
-    from config import SCOPES, PATHS, ERROR_MESSAGES, EMAILS_PER_PAGE
+    from config import SCOPES, PATHS, ERROR_MESSAGES, EMAILS_PER_PAGE, GMAIL_BATCH_SIZE, GMAIL_MESSAGE_FIELDS, GMAIL_CACHE_TTL, GMAIL_NUM_RETRIES
     from logger import log_info, log_warning, log_error, log_debug
-    from text_utils import clean_text_for_display, clean_text_for_model, extract_links
+
+try:
+    from .text_utils import clean_html, clean_text_for_display, clean_and_extract
+    from .validation_utils import validate_email_data
+except ImportError:
+    from text_utils import clean_html, clean_text_for_display, clean_and_extract
     from validation_utils import validate_email_data
 
 
-def gmail_authenticate() -> object:
-    """Authenticate with Gmail API"""
+_local = threading.local()
+
+
+class _OrjsonModel(JsonModel):
+    """JsonModel that parses Gmail responses with orjson"""
+
+    def deserialize(self, content: Union[str, bytes]) -> object:
+        try:
+            body = orjson.loads(content)
+        except orjson.JSONDecodeError:
+            return super().deserialize(content)
+        if self._data_wrapper and isinstance(body, dict) and "data" in body:
+            body = body["data"]
+        return body
+
+
+def _load_credentials() -> Credentials:
+    """Load, refresh or request Gmail API credentials"""
     creds: Optional[Credentials] = None
     creds_path: str = PATHS["credentials_file"]
     token_path: str = PATHS["token_file"]
@@ -37,8 +67,7 @@ def gmail_authenticate() -> object:
                 creds = Credentials.from_authorized_user_file(token_path, SCOPES)
                 log_info("Credentials loaded from token file")
             except Exception as e:
-                log_warning(f"Token file corrupted or expired: {e}")
-                st.warning(f"Token file corrupted or expired: {e}. Requesting new authorization.")
+                log_warning("Token file corrupted or expired, requesting new authorization: %s", e)
                 creds = None
         
         if not creds or not creds.valid:
@@ -48,8 +77,7 @@ def gmail_authenticate() -> object:
                     creds.refresh(Request())
                     log_info("Credentials refreshed successfully")
                 except Exception as e:
-                    log_warning(f"Failed to refresh credentials: {e}")
-                    st.warning(f"Failed to refresh credentials: {e}. Requesting new authorization.")
+                    log_warning("Failed to refresh credentials, requesting new authorization: %s", e)
                     creds = None
             
             if not creds:
@@ -63,7 +91,7 @@ def gmail_authenticate() -> object:
                     creds = flow.run_local_server(port=0)
                     log_info("New authorization obtained successfully")
                 except Exception as e:
-                    log_error(f"{ERROR_MESSAGES['authentication_error']}", exception=e)
+                    log_error(ERROR_MESSAGES["authentication_error"], exception=e)
                     st.error(f"{ERROR_MESSAGES['authentication_error']}: {e}")
                     st.stop()
             
@@ -73,16 +101,9 @@ def gmail_authenticate() -> object:
                     token.write(creds.to_json())
                 log_info("Credentials saved to token file")
             except Exception as e:
-                log_warning(f"Could not save token file: {e}")
+                log_warning("Could not save token file: %s", e)
         
-        try:
-            service = build("gmail", "v1", credentials=creds)
-            log_info("Gmail service built successfully")
-            return service
-        except Exception as e:
-            log_error("Failed to build Gmail service", exception=e)
-            st.error(f"Failed to build Gmail service: {e}")
-            st.stop()
+        return creds
     
     except Exception as e:
         log_error("Unexpected error during authentication", exception=e)
@@ -90,8 +111,57 @@ def gmail_authenticate() -> object:
         st.stop()
 
 
+def _build_service(creds: Credentials) -> object:
+    """Build a Gmail service with its own HTTP connection"""
+    try:
+        service = build(
+            "gmail",
+            "v1",
+            credentials=creds,
+            model=_OrjsonModel() if orjson else None
+        )
+        log_info("Gmail service built successfully")
+        return service
+    except Exception as e:
+        log_error("Failed to build Gmail service", exception=e)
+        st.error(f"Failed to build Gmail service: {e}")
+        st.stop()
+
+
+def gmail_authenticate() -> object:
+    """Authenticate with Gmail API"""
+    return _build_service(_load_credentials())
+
+
+@st.cache_resource(show_spinner=False)
+def _get_credentials() -> Credentials:
+    """Return Gmail API credentials, loaded once per process"""
+    return _load_credentials()
+
+
+def _discard_credentials() -> None:
+    """Drop the cached credentials and token file so the next service requests new authorization"""
+    _get_credentials.clear()
+    try:
+        os.remove(PATHS["token_file"])
+        log_info("Removed rejected token file")
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        log_warning("Could not remove token file: %s", e)
+
+
+def get_gmail_service() -> object:
+    """Return this thread's Gmail service, rebuilt only when the cached credentials change"""
+    creds = _get_credentials()
+    if getattr(_local, "creds", None) is not creds:
+        _local.service = _build_service(creds)
+        _local.creds = creds
+    return _local.service
+
+
 def extract_email_content(payload: Dict) -> str:
-    """Extract plain text content from email payload"""
+    """Extract plain text content from email payload, preferring text/plain over text/html"""
     def decode_part(part: Dict) -> str:
         """Decode a message part"""
         try:
@@ -99,118 +169,193 @@ def extract_email_content(payload: Dict) -> str:
                 return base64.urlsafe_b64decode(part["body"]["data"]).decode("utf-8", errors="replace")
             return ""
         except Exception as e:
-            log_warning(f"Error decoding email part: {e}")
+            log_warning("Error decoding email part: %s", e)
             return ""
     
     try:
-        if "body" in payload and payload["body"].get("data"):
-            content = decode_part(payload)
-            if payload.get("mimeType", "").startswith("text/html"):
-                return clean_html(content)
-            return content
+        best_score, best_part = 0, None
+        queue = deque([payload])
+        while queue:
+            part = queue.popleft()
+            mime_type = part.get("mimeType", "")
+            score = 2 if mime_type == "text/plain" else 1 if mime_type.startswith("text/html") else 0
+            if score > best_score and part.get("body", {}).get("data"):
+                best_score, best_part = score, part
+                if score == 2:
+                    break
+            queue.extend(part.get("parts", ()))
         
-        if "parts" in payload:
-            for part in payload["parts"]:
-                if part.get("mimeType") == "text/plain" and part.get("body", {}).get("data"):
-                    return decode_part(part)
-            
-            for part in payload["parts"]:
-                if part.get("mimeType", "").startswith("text/html") and part.get("body", {}).get("data"):
-                    return clean_html(decode_part(part))
-            
-            for part in payload["parts"]:
-                if "parts" in part:
-                    result = extract_email_content(part)
-                    if result:
-                        return result
-        
-        return ""
+        if best_part is None:
+            return ""
+        content = decode_part(best_part)
+        return clean_html(content) if best_score == 1 else content
     except Exception as e:
-        log_warning(f"Error extracting email content: {e}")
+        log_warning("Error extracting email content: %s", e)
         return ""
 
 
-def clean_html(html_content: str) -> str:
-    """Convert HTML to plain text"""
+def _message_request(service: object, msg_id: str) -> object:
+    """Build a messages.get request for the fields fetch_emails uses"""
+    return service.users().messages().get(
+        userId="me",
+        id=msg_id,
+        format="full",
+        fields=GMAIL_MESSAGE_FIELDS
+    )
+
+
+def _get_messages(service: object, messages: List[Dict], on_message: Callable[[int, Optional[Dict], Optional[Exception]], None]) -> None:
+    """Fetch full message data in batched requests, passing each response to on_message as it arrives"""
+    received = set()
+
+    def on_response(request_id: str, response: Optional[Dict], exception: Optional[Exception]) -> None:
+        idx = int(request_id)
+        if isinstance(exception, HttpError) and _should_retry_response(exception.resp.status, exception.content):
+            log_debug("Batched get for email %s returned %s, will retry with backoff", idx, exception.resp.status)
+            return
+        received.add(idx)
+        on_message(idx, response, exception)
+
     try:
-        import re
-        from html import unescape
-        text: str = re.sub(r"<[^>]+>", " ", html_content)
-        text = unescape(text)
-        log_debug("HTML cleaned successfully")
-        return text
-    except Exception as e:
-        log_warning(f"Error cleaning HTML: {e}")
-        return html_content
+        for start in range(0, len(messages), GMAIL_BATCH_SIZE):
+            batch = service.new_batch_http_request(callback=on_response)
+            for idx in range(start, min(start + GMAIL_BATCH_SIZE, len(messages))):
+                batch.add(_message_request(service, messages[idx]["id"]), request_id=str(idx))
+            batch.execute()
+        log_debug("Fetched %s messages in batched requests", len(received))
+    except HttpError as e:
+        log_warning("Batch request failed, fetching messages individually: %s", e)
 
+    for idx, msg in enumerate(messages):
+        if idx in received:
+            continue
+        try:
+            on_message(idx, _message_request(service, msg["id"]).execute(num_retries=GMAIL_NUM_RETRIES), None)
+        except Exception as msg_error:
+            on_message(idx, None, msg_error)
 
-def fetch_emails(page_token: Optional[str] = None, max_results: int = EMAILS_PER_PAGE) -> Tuple[List[Dict], Optional[str]]:
-    """Fetch emails from Gmail"""
+
+def _process_message(idx: int, msg_data: Dict) -> Tuple[Optional[Dict], List[str]]:
+    """Build and validate an email dict from message data, returning it with any warnings"""
+    warnings: List[str] = []
     try:
-        log_info(f"Fetching {max_results} emails from Gmail...")
-        service = gmail_authenticate()
+        headers = {h["name"]: h["value"] for h in msg_data.get("payload", {}).get("headers", [])}
         
         try:
-            results = service.users().messages().list(
-                userId="me",
-                maxResults=max_results,
-                pageToken=page_token
-            ).execute()
-            log_info("Email list retrieved successfully")
+            raw_content = extract_email_content(msg_data.get("payload", {}))
+            log_debug("Extracted content from email %s", idx)
         except Exception as e:
-            log_error("Failed to fetch email list", exception=e)
-            st.error(f"Failed to fetch email list: {e}")
-            return [], None
+            warnings.append(f"Could not extract content from email {idx}: {e}")
+            raw_content = ""
         
-        messages = results.get("messages", [])
-        next_page_token = results.get("nextPageToken")
-        log_debug(f"Retrieved {len(messages)} messages")
+        cleaned_content, links = clean_and_extract(raw_content)
+        email_data = {
+            "subject": headers.get("Subject", "No Subject"),
+            "sender": headers.get("From", "Unknown Sender"),
+            "date": headers.get("Date", "Unknown Date"),
+            "raw_content": clean_text_for_display(raw_content),
+            "cleaned_content": cleaned_content,
+            "links": links
+        }
         
-        emails = []
-        for idx, msg in enumerate(messages):
-            try:
-                msg_data = service.users().messages().get(
-                    userId="me", 
-                    id=msg["id"], 
-                    format="full"
-                ).execute()
-                
-                headers = {h["name"]: h["value"] for h in msg_data.get("payload", {}).get("headers", [])}
-                
-                try:
-                    raw_content = extract_email_content(msg_data.get("payload", {}))
-                    log_debug(f"Extracted content from email {idx}")
-                except Exception as e:
-                    log_warning(f"Could not extract content from email {idx}: {e}")
-                    st.warning(f"Could not extract content from email {idx}: {e}")
-                    raw_content = ""
-                
-                email_data = {
-                    "subject": headers.get("Subject", "No Subject"),
-                    "sender": headers.get("From", "Unknown Sender"),
-                    "date": headers.get("Date", "Unknown Date"),
-                    "raw_content": clean_text_for_display(raw_content),
-                    "cleaned_content": clean_text_for_model(raw_content),
-                    "links": extract_links(raw_content)
-                }
-                
-                is_valid, error_msg = validate_email_data(email_data)
-                if is_valid:
-                    emails.append(email_data)
-                    log_debug(f"Email {idx} validated successfully")
-                else:
-                    log_warning(f"Email {idx} validation failed: {error_msg}")
-                    st.warning(f"Email {idx} validation failed: {error_msg}")
-                    
-            except Exception as e:
-                log_warning(f"Failed to process email {idx}: {e}")
-                st.warning(f"Failed to process email {idx}: {e}")
-                continue
-        
-        log_info(f"Successfully fetched and validated {len(emails)} emails")
-        return emails, next_page_token
+        is_valid, error_msg = validate_email_data(email_data)
+        if is_valid:
+            log_debug("Email %s validated successfully", idx)
+            return email_data, warnings
         
+        warnings.append(f"Email {idx} validation failed: {error_msg}")
+        return None, warnings
     except Exception as e:
-        log_error(f"{ERROR_MESSAGES['email_fetch_error']}", exception=e)
+        warnings.append(f"Failed to process email {idx}: {e}")
+        return None, warnings
+
+
+class _IncompletePage(Exception):
+    """Raised by _fetch_page so a page with missing emails is returned but never cached"""
+
+    def __init__(self, emails: List[Dict], next_page_token: Optional[str], warnings: List[str]) -> None:
+        super().__init__(f"{len(warnings)} email(s) could not be fetched")
+        self.emails = emails
+        self.next_page_token = next_page_token
+        self.warnings = warnings
+
+
+@st.cache_data(ttl=GMAIL_CACHE_TTL, show_spinner=False)
+def _fetch_page(page_token: Optional[str], max_results: int) -> Tuple[List[Dict], Optional[str], List[str]]:
+    """Fetch and process one page of emails, raising instead of returning a failed or partial page"""
+    log_info("Fetching %s emails from Gmail...", max_results)
+    service = get_gmail_service()
+    results = service.users().messages().list(
+        userId="me",
+        maxResults=max_results,
+        pageToken=page_token
+    ).execute()
+    log_info("Email list retrieved successfully")
+    
+    messages = results.get("messages", [])
+    next_page_token = results.get("nextPageToken")
+    log_debug("Retrieved %s messages", len(messages))
+    
+    processed: Dict[int, Tuple[Optional[Dict], List[str]]] = {}
+    failed = False
+    
+    def on_message(idx: int, msg_data: Optional[Dict], msg_error: Optional[Exception]) -> None:
+        nonlocal failed
+        if msg_error is not None or msg_data is None:
+            failed = True
+            processed[idx] = None, [f"Failed to process email {idx}: {msg_error or 'no response received'}"]
+        else:
+            processed[idx] = _process_message(idx, msg_data)
+    
+    _get_messages(service, messages, on_message)
+    
+    emails: List[Dict] = []
+    warnings: List[str] = []
+    for idx in range(len(messages)):
+        if idx not in processed:
+            failed = True
+        email_data, email_warnings = processed.get(idx, (None, [f"Failed to process email {idx}: no response received"]))
+        for warning in email_warnings:
+            log_warning(warning)
+        warnings.extend(email_warnings)
+        if email_data is not None:
+            emails.append(email_data)
+    
+    if failed or not emails:
+        raise _IncompletePage(emails, next_page_token, warnings)
+    
+    log_info("Successfully fetched and validated %s emails", len(emails))
+    return emails, next_page_token, warnings
+
+
+def fetch_emails(page_token: Optional[str] = None, max_results: int = EMAILS_PER_PAGE) -> Tuple[List[Dict], Optional[str]]:
+    """Fetch emails from Gmail, caching complete pages per page token"""
+    try:
+        try:
+            page = _fetch_page(page_token, max_results)
+        except (HttpError, RefreshError) as e:
+            if isinstance(e, HttpError) and e.resp.status != 401:
+                raise
+            log_warning("Gmail rejected stored credentials, requesting new authorization: %s", e)
+            _discard_credentials()
+            page = _fetch_page(page_token, max_results)
+        emails, next_page_token, warnings = page
+    except _IncompletePage as e:
+        emails, next_page_token, warnings = e.emails, e.next_page_token, e.warnings
+    except Exception as e:
+        log_error(ERROR_MESSAGES["email_fetch_error"], exception=e)
         st.error(f"{ERROR_MESSAGES['email_fetch_error']}: {e}")
         return [], None
+    
+    for warning in warnings:
+        st.warning(warning)
+    return emails, next_page_token
+
+
+def prefetch_emails(page_token: Optional[str], max_results: int = EMAILS_PER_PAGE) -> None:
+    """Warm the page cache from a background thread, leaving failed pages to be fetched on demand"""
+    try:
+        _fetch_page(page_token, max_results)
+        log_debug("Prefetched page of emails")
+    except Exception as e:
+        log_debug("Prefetch failed, page will be fetched on demand: %s", e)
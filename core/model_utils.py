@@ -3,21 +3,26 @@ ML Model utilities for Spam Email Detector
 """
 
 import pickle
+import numpy as np
 import streamlit as st
-from typing import Tuple, Optional
+from typing import Tuple, Optional, List
 
 try:
-    from ..config import PATHS, ERROR_MESSAGES, TEXT_VALIDATION
+    from ..config import PATHS, ERROR_MESSAGES
     from ..logger import log_info, log_error, log_debug
+except ImportError:
+    from config import PATHS, ERROR_MESSAGES
+    from logger import log_info, log_error, log_debug
+
+try:
     from .text_utils import transform_text
     from .validation_utils import validate_text_input
 except ImportError:
-    from config import PATHS, ERROR_MESSAGES, TEXT_VALIDATION
-    from logger import log_info, log_error, log_debug
     from text_utils import transform_text
     from validation_utils import validate_text_input
 
 
+@st.cache_resource(show_spinner="Loading models...")
 def load_models() -> Tuple[Optional[object], Optional[object]]:
     """Load vectorizer and model with caching"""
     try:
@@ -29,7 +34,7 @@ def load_models() -> Tuple[Optional[object], Optional[object]]:
         log_info("ML models loaded successfully")
         return tfidf, model
     except FileNotFoundError as e:
-        log_error(f"{ERROR_MESSAGES['model_not_found']}", exception=e)
+        log_error(ERROR_MESSAGES["model_not_found"], exception=e)
         st.error(f"{ERROR_MESSAGES['model_not_found']}: {e}")
         st.stop()
         return None, None
@@ -47,30 +52,54 @@ def load_models() -> Tuple[Optional[object], Optional[object]]:
 
 def predict_spam(text: str, tfidf: object, model: object) -> Tuple[Optional[int], float]:
     """Predict if text is spam"""
+    return predict_spam_batch([text], tfidf, model)[0]
+
+
+def predict_spam_batch(texts: List[str], tfidf: object, model: object) -> List[Tuple[Optional[int], float]]:
+    """Predict spam for a batch of texts with a single vectorizer and model call"""
+    results: List[Tuple[Optional[int], float]] = [(None, 0.0)] * len(texts)
     try:
-        is_valid, error_msg = validate_text_input(text, min_length=TEXT_VALIDATION["min_length"], max_length=TEXT_VALIDATION["max_length"])
-        if not is_valid:
-            log_info(f"Text validation failed: {error_msg}")
-            return None, 0.0
+        indices: List[int] = []
+        transformed: List[str] = []
+        for idx, text in enumerate(texts):
+            is_valid, error_msg = validate_text_input(text)
+            if not is_valid:
+                log_info("Text %s validation failed: %s", idx, error_msg)
+                continue
+            transformed_text = transform_text(text)
+            if not transformed_text:
+                log_info("Transformed text %s is empty", idx)
+                continue
+            indices.append(idx)
+            transformed.append(transformed_text)
         
-        log_debug("Starting spam prediction...")
-        transformed = transform_text(text)
         if not transformed:
-            log_info("Transformed text is empty")
-            return None, 0.0
+            return results
         
+        unique_texts = list(dict.fromkeys(transformed))
+        log_debug("Starting batch spam prediction for %s texts (%s unique)...", len(transformed), len(unique_texts))
         try:
-            vector_input = tfidf.transform([transformed])
-            prediction = model.predict(vector_input)[0]
-            probability = model.predict_proba(vector_input)[0].max()
-            log_info(f"Prediction made: {prediction}, Confidence: {probability:.2%}")
-            return prediction, probability
+            vector_input = tfidf.transform(unique_texts)
+            if hasattr(model, "predict_proba"):
+                class_probabilities = model.predict_proba(vector_input)
+                predictions = model.classes_[class_probabilities.argmax(axis=1)]
+                probabilities = class_probabilities.max(axis=1)
+            else:
+                scores = model.decision_function(vector_input)
+                predictions = model.classes_[(scores > 0).astype(int)]
+                probabilities = 1.0 / (1.0 + np.exp(-np.abs(scores)))
+            rows = {text: row for row, text in enumerate(unique_texts)}
+            for idx, text in zip(indices, transformed):
+                row = rows[text]
+                results[idx] = (predictions[row], probabilities[row])
+            log_info("Batch prediction made for %s texts", len(transformed))
+            return results
         except Exception as e:
-            log_error(f"{ERROR_MESSAGES['prediction_error']}", exception=e)
+            log_error(ERROR_MESSAGES["prediction_error"], exception=e)
             st.error(f"{ERROR_MESSAGES['prediction_error']}: {e}")
-            return None, 0.0
+            return [(None, 0.0)] * len(texts)
     
     except Exception as e:
-        log_error("Unexpected error in prediction", exception=e)
-        st.error(f"Unexpected error in prediction: {e}")
-        return None, 0.0
+        log_error("Unexpected error in batch prediction", exception=e)
+        st.error(f"Unexpected error in batch prediction: {e}")
+        return [(None, 0.0)] * len(texts)
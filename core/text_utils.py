@@ -3,20 +3,62 @@ Text processing and cleaning utilities for Spam Email Detector
 """
 
 import re
-import string
+import functools
 import nltk
 from html import unescape
-from typing import List, Tuple
+from typing import List, Tuple, Set
 from nltk.corpus import stopwords
 from nltk.stem import PorterStemmer
 
 try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:
+    LexborHTMLParser = None
+
+try:
+    from ..config import PATHS
     from ..logger import log_debug, log_warning
 except ImportError:
+    from config import PATHS
     from logger import log_debug, log_warning
 
+
+def _ensure_nltk_resource(resource: str, package: str) -> None:
+    """Download an NLTK resource into the data dir only if it is missing"""
+    try:
+        nltk.data.find(resource)
+    except LookupError:
+        log_warning("NLTK %s not found, downloading...", package)
+        nltk.download(package, download_dir=PATHS["nltk_data_dir"], quiet=True)
+
+
+def _load_stopwords() -> Set[str]:
+    """Load NLTK stopwords, downloading the corpus only if it is missing"""
+    _ensure_nltk_resource("corpora/stopwords", "stopwords")
+    return set(stopwords.words("english"))
+
+
+nltk.data.path.insert(0, PATHS["nltk_data_dir"])
+_ensure_nltk_resource("tokenizers/punkt", "punkt")
+
 ps = PorterStemmer()
-stop_words = set(stopwords.words("english"))
+stop_words = _load_stopwords()
+_SKIP_WORDS = frozenset(stop_words)
+
+_stem = functools.lru_cache(maxsize=65536)(ps.stem)
+
+_RE_URL = re.compile(r"http[s]?://\S+")
+_RE_CLEAN = re.compile(
+    r"http[s]?://\S+"
+    r"|www\.\S+"
+    r"|data:image\/[^;]+;base64,[A-Za-z0-9+/=]+"
+    r"|cid:[^\s'\"<>]+"
+    r"|<[^>]*>",
+    re.IGNORECASE
+)
+_RE_SCRIPT_STYLE = re.compile(r"<(script|style)\b[^>]*>.*?</\1>", re.IGNORECASE | re.DOTALL)
+_RE_HTML_TAG = re.compile(r"<[^>]+>")
+_RE_MARKDOWN_SPECIAL = re.compile(r"([\\`*_{}\[\]()#+\-.!|<>~$:])")
 
 
 def transform_text(text: str) -> str:
@@ -25,27 +67,35 @@ def transform_text(text: str) -> str:
         if not text:
             return ""
         
-        text = text.lower()
-        text = nltk.word_tokenize(text)
-        text = [word for word in text if word.isalnum()]
-        text = [word for word in text if word not in stop_words and word not in string.punctuation]
-        text = [ps.stem(word) for word in text]
+        tokens = [_stem(word) for word in nltk.word_tokenize(text.lower()) if word.isalnum() and word not in _SKIP_WORDS]
         log_debug("Text transformed successfully")
-        return " ".join(text)
+        return " ".join(tokens)
     except Exception as e:
-        log_warning(f"Error transforming text: {e}")
+        log_warning("Error transforming text: %s", e)
         return ""
 
 
 def clean_html(html_content: str) -> str:
-    """Convert HTML to plain text"""
+    """Convert HTML to plain text, dropping script and style content"""
     try:
-        text: str = re.sub(r"<[^>]+>", " ", html_content)
+        if LexborHTMLParser is not None:
+            try:
+                tree = LexborHTMLParser(html_content)
+                for tag in tree.css("script, style, noscript"):
+                    tag.decompose()
+                text: str = tree.body.text(separator=" ") if tree.body else ""
+                log_debug("HTML cleaned successfully")
+                return text
+            except Exception as e:
+                log_debug("HTML parser failed, falling back to regex: %s", e)
+        
+        text = _RE_SCRIPT_STYLE.sub(" ", html_content)
+        text = _RE_HTML_TAG.sub(" ", text)
         text = unescape(text)
         log_debug("HTML cleaned successfully")
         return text
     except Exception as e:
-        log_warning(f"Error cleaning HTML: {e}")
+        log_warning("Error cleaning HTML: %s", e)
         return html_content
 
 
@@ -55,10 +105,22 @@ def clean_text_for_display(text: str) -> str:
         if not text:
             return text
         
-        text = re.sub(r"\s+", " ", text).strip()
+        text = " ".join(text.split())
+        return text
+    except Exception as e:
+        log_warning("Error cleaning text for display: %s", e)
         return text
+
+
+def escape_markdown(text: str) -> str:
+    """Escape markdown syntax so text renders literally in st.markdown"""
+    try:
+        if not text:
+            return text
+        
+        return _RE_MARKDOWN_SPECIAL.sub(r"\\\1", text)
     except Exception as e:
-        log_warning(f"Error cleaning text for display: {e}")
+        log_warning("Error escaping markdown: %s", e)
         return text
 
 
@@ -68,19 +130,12 @@ def clean_text_for_model(text: str) -> str:
         if not text:
             return text
         
-        text = re.sub(r"http[s]?://\S+", " ", text)
-        text = re.sub(r"www\.\S+", " ", text)
-        
-        text = re.sub(r"data:image\/[^;]+;base64,[A-Za-z0-9+/=]+", " ", text)
-        text = re.sub(r"cid:[^\s'\"<>]+", " ", text, flags=re.IGNORECASE)
-        
-        text = re.sub(r"<[^>]*>", " ", text, flags=re.IGNORECASE)
-        
-        text = re.sub(r"\s+", " ", text).strip()
+        text = _RE_CLEAN.sub(" ", text)
+        text = " ".join(text.split())
         log_debug("Text cleaned for model successfully")
         return text
     except Exception as e:
-        log_warning(f"Error cleaning text for model: {e}")
+        log_warning("Error cleaning text for model: %s", e)
         return text
 
 
@@ -89,9 +144,29 @@ def extract_links(text: str) -> List[str]:
     try:
         if not text:
             return []
-        links = re.findall(r"http[s]?://\S+", text)
-        log_debug(f"Extracted {len(links)} links from text")
+        links = _RE_URL.findall(text)
+        log_debug("Extracted %s links from text", len(links))
         return links
     except Exception as e:
-        log_warning(f"Error extracting links: {e}")
+        log_warning("Error extracting links: %s", e)
         return []
+
+
+def clean_and_extract(text: str) -> Tuple[str, List[str]]:
+    """Clean text for model processing and extract links in a single scan"""
+    links: List[str] = []
+    
+    def strip_match(match: re.Match) -> str:
+        links.extend(_RE_URL.findall(match.group()))
+        return " "
+    
+    try:
+        if not text:
+            return text, links
+        
+        cleaned = " ".join(_RE_CLEAN.sub(strip_match, text).split())
+        log_debug("Text cleaned for model, extracted %s links", len(links))
+        return cleaned, links
+    except Exception as e:
+        log_warning("Error cleaning text and extracting links: %s", e)
+        return text, []
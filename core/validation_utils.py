@@ -2,6 +2,7 @@
 Input validation utilities for Spam Email Detector
 """
 
+from itertools import compress
 from typing import Tuple, Dict, List
 
 try:
@@ -11,6 +12,10 @@ except ImportError:
     from config import TEXT_VALIDATION, EMAIL_VALIDATION
     from logger import log_debug, log_warning
 
+_REQUIRED_FIELDS = ("subject", "sender", "raw_content", "cleaned_content")
+_REQUIRED_FIELD_SET = frozenset(_REQUIRED_FIELDS)
+_MAX_EMAIL_SIZE = EMAIL_VALIDATION["max_size"]
+
 
 def validate_text_input(text: str, min_length: int = TEXT_VALIDATION["min_length"], max_length: int = TEXT_VALIDATION["max_length"]) -> Tuple[bool, str]:
     """
@@ -29,22 +34,23 @@ def validate_text_input(text: str, min_length: int = TEXT_VALIDATION["min_length
             log_warning("Text validation failed: input is not a string")
             return False, "Text must be a string"
         
-        if len(text.strip()) < min_length:
-            log_warning(f"Text validation failed: text length {len(text.strip())} < {min_length}")
+        stripped_length = len(text.strip())
+        if stripped_length < min_length:
+            log_warning("Text validation failed: text length %s < %s", stripped_length, min_length)
             return False, f"Text must contain at least {min_length} character(s)"
         
         if len(text) > max_length:
-            log_warning(f"Text validation failed: text length {len(text)} > {max_length}")
+            log_warning("Text validation failed: text length %s > %s", len(text), max_length)
             return False, f"Text exceeds maximum length of {max_length} characters"
         
-        if text.strip() == "":
+        if stripped_length == 0:
             log_warning("Text validation failed: text is empty or whitespace only")
             return False, "Text cannot be empty or contain only whitespace"
         
         log_debug("Text validation passed")
         return True, ""
     except Exception as e:
-        log_warning(f"Error during text validation: {e}")
+        log_warning("Error during text validation: %s", e)
         return False, f"Validation error: {str(e)}"
 
 
@@ -59,30 +65,28 @@ def validate_email_data(email: Dict[str, str]) -> Tuple[bool, str]:
         Tuple of (is_valid, error_message)
     """
     try:
-        required_fields = ["subject", "sender", "raw_content", "cleaned_content"]
-        
         if not isinstance(email, dict):
             log_warning("Email validation failed: input is not a dictionary")
             return False, "Email must be a dictionary"
         
-        for field in required_fields:
-            if field not in email:
-                log_warning(f"Email validation failed: missing field {field}")
-                return False, f"Email missing required field: {field}"
-            
-            if field in ["subject", "sender", "raw_content", "cleaned_content"]:
-                if not isinstance(email[field], str):
-                    log_warning(f"Email validation failed: field {field} is not a string")
-                    return False, f"Field '{field}' must be a string"
+        if not _REQUIRED_FIELD_SET.issubset(email):
+            field = next(f for f in _REQUIRED_FIELDS if f not in email)
+            log_warning("Email validation failed: missing field %s", field)
+            return False, f"Email missing required field: {field}"
         
-        if len(email.get("raw_content", "")) > EMAIL_VALIDATION["max_size"]:
-            log_warning(f"Email validation failed: content size exceeds {EMAIL_VALIDATION['max_size']}")
+        for field in _REQUIRED_FIELDS:
+            if not isinstance(email[field], str):
+                log_warning("Email validation failed: field %s is not a string", field)
+                return False, f"Field '{field}' must be a string"
+        
+        if len(email["raw_content"]) > _MAX_EMAIL_SIZE:
+            log_warning("Email validation failed: content size exceeds %s", _MAX_EMAIL_SIZE)
             return False, "Email content exceeds maximum size"
         
         log_debug("Email validation passed")
         return True, ""
     except Exception as e:
-        log_warning(f"Error during email validation: {e}")
+        log_warning("Error during email validation: %s", e)
         return False, f"Validation error: {str(e)}"
 
 
@@ -105,27 +109,21 @@ def validate_batch_emails(emails: List[Dict]) -> Tuple[bool, str, List[Dict]]:
             log_warning("Batch validation failed: empty email list")
             return False, "No emails provided", []
         
-        valid_emails = []
-        invalid_count = 0
+        valid_mask = [validate_email_data(email)[0] for email in emails]
+        if all(valid_mask):
+            log_debug("Batch validation passed: %s emails valid", len(emails))
+            return True, "", list(emails)
         
-        for idx, email in enumerate(emails):
-            is_valid, error_msg = validate_email_data(email)
-            if is_valid:
-                valid_emails.append(email)
-            else:
-                invalid_count += 1
+        valid_emails = list(compress(emails, valid_mask))
+        invalid_count = len(emails) - len(valid_emails)
         
-        if invalid_count > 0 and len(valid_emails) == 0:
-            log_warning(f"Batch validation failed: all {invalid_count} emails invalid")
+        if not valid_emails:
+            log_warning("Batch validation failed: all %s emails invalid", invalid_count)
             return False, f"All {invalid_count} emails failed validation", []
         
-        if invalid_count > 0:
-            message = f"Validated {len(valid_emails)} email(s), skipped {invalid_count} invalid email(s)"
-            log_debug(message)
-            return True, message, valid_emails
-        
-        log_debug(f"Batch validation passed: {len(valid_emails)} emails valid")
-        return True, "", valid_emails
+        message = f"Validated {len(valid_emails)} email(s), skipped {invalid_count} invalid email(s)"
+        log_debug(message)
+        return True, message, valid_emails
     except Exception as e:
-        log_warning(f"Error during batch validation: {e}")
+        log_warning("Error during batch validation: %s", e)
         return False, f"Validation error: {str(e)}", []
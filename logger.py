@@ -2,11 +2,18 @@
 Logging configuration for Spam Email Detector application
 """
 
+import atexit
 import logging
 import os
+import queue
+from logging.handlers import QueueHandler, QueueListener
 from datetime import datetime
 from config import LOGGING_CONFIG
 
+logging.logThreads = False
+logging.logProcesses = False
+logging.logMultiprocessing = False
+
 def setup_logger() -> logging.Logger:
     """
     Setup and configure logger for the application
@@ -30,12 +37,16 @@ def setup_logger() -> logging.Logger:
     file_handler = logging.FileHandler(LOGGING_CONFIG["log_file"])
     file_handler.setLevel(getattr(logging, LOGGING_CONFIG["level"]))
     file_handler.setFormatter(formatter)
-    logger.addHandler(file_handler)
     
     console_handler = logging.StreamHandler()
     console_handler.setLevel(logging.WARNING)
     console_handler.setFormatter(formatter)
-    logger.addHandler(console_handler)
+    
+    log_queue: queue.Queue = queue.Queue(-1)
+    logger.addHandler(QueueHandler(log_queue))
+    listener = QueueListener(log_queue, file_handler, console_handler, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
     
     return logger
 
@@ -43,24 +54,24 @@ def setup_logger() -> logging.Logger:
 logger = setup_logger()
 
 
-def log_info(message: str) -> None:
+def log_info(message: str, *args: object) -> None:
     """Log info message"""
-    logger.info(message)
+    logger.info(message, *args)
 
 
-def log_warning(message: str) -> None:
+def log_warning(message: str, *args: object) -> None:
     """Log warning message"""
-    logger.warning(message)
+    logger.warning(message, *args)
 
 
-def log_error(message: str, exception: Exception = None) -> None:
+def log_error(message: str, *args: object, exception: Exception = None) -> None:
     """Log error message with optional exception details"""
     if exception:
-        logger.error(f"{message} - Exception: {str(exception)}", exc_info=True)
+        logger.error("%s - Exception: %s", message % args if args else message, exception, exc_info=True)
     else:
-        logger.error(message)
+        logger.error(message, *args)
 
 
-def log_debug(message: str) -> None:
+def log_debug(message: str, *args: object) -> None:
     """Log debug message"""
-    logger.debug(message)
+    logger.debug(message, *args)